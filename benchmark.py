@@ -0,0 +1,150 @@
+# Compares the root search drivers, the full window alpha-beta search against MTD(f), on a fixed set of positions
+# Every position is searched to a fixed depth by a new searcher so no run starts with a warm table
+#
+#   python benchmark.py
+#
+# or plays the search against itself and counts the moves that the win in one / forced block shortcut
+# (threats.forced_move) plays without searching
+#
+#   python benchmark.py selfplay [size] [k] [games] [depth]
+#
+# or checks the search on rectangular boards, every position against its transpose
+#
+#   python benchmark.py rectangles [positions]
+
+import math
+import random
+import sys
+import time as t
+
+from board import BitBoard
+from constants import *
+from search import AlphaBeta
+from threats import forced_move
+
+# (rows, columns, depth, marks as (row, col, player))
+POSITIONS = [
+    (MEDIUM_ROWS, MEDIUM_COLUMNS, 7, []),
+    (MEDIUM_ROWS, MEDIUM_COLUMNS, 7, [(1, 1, 1)]),
+    (MEDIUM_ROWS, MEDIUM_COLUMNS, 7, [(0, 0, 1), (1, 1, 2)]),
+    (MEDIUM_ROWS, MEDIUM_COLUMNS, 9, [(1, 1, 1), (2, 2, 2), (1, 2, 1), (0, 3, 2)]),
+    (MEDIUM_ROWS, MEDIUM_COLUMNS, 10, [(0, 1, 1), (1, 1, 2), (2, 1, 1), (2, 2, 2), (3, 0, 1), (1, 2, 2)]),
+    (LARGE_ROWS, LARGE_COLUMNS, 5, []),
+    (LARGE_ROWS, LARGE_COLUMNS, 5, [(2, 2, 1)]),
+    (LARGE_ROWS, LARGE_COLUMNS, 6, [(2, 2, 1), (1, 1, 2), (1, 2, 1)]),
+    (LARGE_ROWS, LARGE_COLUMNS, 6, [(2, 2, 1), (1, 3, 2), (3, 1, 1), (2, 1, 2), (2, 3, 1), (0, 4, 2)]),
+]
+
+
+def run(driver, rows, columns, depth, marks):
+    # searches the position with a new searcher and returns the eval, move, nodes and seconds taken
+    board = BitBoard(rows, columns)
+    for row, col, player in marks:
+        board.mark_square(row, col, player)
+    maximizing = len(marks) % 2 == 0
+
+    searcher = AlphaBeta(rows, columns, max_depth=depth)
+    start = t.time()
+    if driver == 'mtdf':
+        ai_eval, move = searcher.mtdf(board, maximizing)
+    else:
+        ai_eval, move = searcher.minimax(board, -math.inf, math.inf, maximizing, 0)
+
+    return ai_eval, move, searcher.nodes, t.time() - start
+
+
+def selfplay(size=MEDIUM_ROWS, k=None, games=20, depth=4, seed=0):
+    """
+    plays games with two random opening moves and the search to depth for both players after that,
+    the shortcut taking every move it can, and prints how often it did
+
+    """
+    random.seed(seed)
+    moves = shortcuts = wins = blocks = 0
+    results = {0: 0, 1: 0, 2: 0}
+    start = t.time()
+    for _ in range(games):
+        board = BitBoard(size, size, k)
+        searcher = AlphaBeta(size, size, max_depth=depth, k=k)
+        player = 1
+        while not board.winning_state() and not board.full_board():
+            if board.marked_squares < 2:
+                move = random.choice(board.get_empty_squares())
+            else:
+                moves += 1
+                move, winning = forced_move(board, player)
+                if move is not None:
+                    shortcuts += 1
+                    wins += winning
+                    blocks += not winning
+                else:
+                    searcher.orderer.age()
+                    move = searcher.minimax(board, -math.inf, math.inf, player == 1, 0)[1]
+            board.mark_square(move[0], move[1], player)
+            player = 3 - player
+        results[board.winning_state()] += 1
+
+    print(f'{games} games on {size}x{size}, k {board.k}, depth {depth}: player 1 won {results[1]}, '
+          f'player 2 won {results[2]}, {results[0]} draws in {round(t.time() - start, 2)} seconds')
+    print(f'shortcut on {shortcuts} of {moves} moves after the opening ({round(100 * shortcuts / max(moves, 1), 1)}%), '
+          f'{wins} wins in one and {blocks} forced blocks')
+
+
+def rectangles(positions=20, seed=0):
+    """
+    searches random positions on 3x4 and 3x5 boards with k 3 and the same positions transposed,
+    which have to get the same eval as the two boards only differ by a reflection
+
+    """
+    random.seed(seed)
+    differ = 0
+    for rows, columns in ((3, 4), (3, 5)):
+        for _ in range(positions):
+            board = BitBoard(rows, columns, 3)
+            transposed = BitBoard(columns, rows, 3)
+            player = 1
+            for _ in range(random.randint(0, 4)):
+                row, col = random.choice(board.get_empty_squares())
+                board.mark_square(row, col, player)
+                transposed.mark_square(col, row, player)
+                player = 3 - player
+                if board.winning_state():
+                    break
+            if board.winning_state():
+                continue
+
+            ai_eval = AlphaBeta(rows, columns, k=3).minimax(board, -math.inf, math.inf, player == 1, 0)[0]
+            other = AlphaBeta(columns, rows, k=3).minimax(transposed, -math.inf, math.inf, player == 1, 0)[0]
+            if abs(ai_eval - other) > 1e-9:
+                differ += 1
+                print(f'{rows}x{columns} {board.moves}: eval {ai_eval}, transposed {other}')
+
+    print(f'{differ} of {2 * positions} rectangular positions differ from their transpose')
+
+
+def main():
+    totals = {'minimax': [0, 0], 'mtdf': [0, 0]}
+    for rows, columns, depth, marks in POSITIONS:
+        results = {}
+        for driver in totals:
+            ai_eval, move, nodes, seconds = run(driver, rows, columns, depth, marks)
+            results[driver] = ai_eval
+            totals[driver][0] += nodes
+            totals[driver][1] += seconds
+            print(f'{rows}x{columns} {len(marks)} marks depth {depth} {driver}: '
+                  f'eval {round(ai_eval, 5)} move {move} nodes {nodes} time {round(seconds, 3)}')
+        if abs(results['minimax'] - results['mtdf']) > 1e-9:
+            print('evals differ')
+
+    for driver, (nodes, seconds) in totals.items():
+        print(f'{driver}: {nodes} nodes in {round(seconds, 2)} seconds')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['selfplay']:
+        args = [int(arg) for arg in sys.argv[2:]]
+        selfplay(args[0] if args else MEDIUM_ROWS, args[1] if len(args) > 1 else None, *args[2:4])
+    elif sys.argv[1:2] == ['rectangles']:
+        rectangles(*[int(arg) for arg in sys.argv[2:3]])
+    else:
+        main()
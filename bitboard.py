@@ -0,0 +1,108 @@
+# Bitboard helpers shared by every board size
+# Each player owns one integer, bit (row * columns + col) is set when that player has marked the square
+
+import numpy as np
+
+
+def square_bit(row, col, columns):
+    return 1 << (row * columns + col)
+
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(mask):
+        return bin(mask).count('1')
+
+
+def iter_bits(mask):
+    # yields the index of every set bit, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def line_masks(rows, columns, k):
+    """
+    returns the bitmask of every k in a row segment in the order
+    columns, rows, main diagonals, anti diagonals, each from the top left.
+    With k equal to the board size that is one mask per column, per row and per diagonal
+
+    """
+    masks = []
+
+    # vertical lines
+    for col in range(columns):
+        for row in range(rows - k + 1):
+            masks.append(sum(square_bit(row + i, col, columns) for i in range(k)))
+
+    # horizontal lines
+    for row in range(rows):
+        for col in range(columns - k + 1):
+            masks.append(sum(square_bit(row, col + i, columns) for i in range(k)))
+
+    # diagonal lines
+    for row in range(rows - k + 1):
+        for col in range(columns - k + 1):
+            masks.append(sum(square_bit(row + i, col + i, columns) for i in range(k)))
+    for row in range(k - 1, rows):
+        for col in range(columns - k + 1):
+            masks.append(sum(square_bit(row - i, col + i, columns) for i in range(k)))
+
+    return masks
+
+
+def cell_lines(rows, columns, k):
+    # the indices (into LINE_MASKS) of the lines through each square, indexed by square
+    lines = LINE_MASKS[(rows, columns, k)]
+    return [[line for line, mask in enumerate(lines) if mask >> index & 1] for index in range(rows * columns)]
+
+
+def neighbours(rows, columns, distance):
+    # the squares at most distance rows and columns away from each square, not the square itself, indexed by square
+    table = []
+    for row in range(rows):
+        for col in range(columns):
+            table.append([r * columns + c
+                          for r in range(max(0, row - distance), min(rows, row + distance + 1))
+                          for c in range(max(0, col - distance), min(columns, col + distance + 1))
+                          if (r, c) != (row, col)])
+
+    return table
+
+
+class SizeTable(dict):
+    """
+    per board size tables, built from the key the first time a size is asked for and kept,
+    so every size (6x6, 7x7 ...) costs nothing until it is played
+
+    """
+    def __init__(self, build):
+        super().__init__()
+        self.build = build
+
+    def __missing__(self, key):
+        table = self[key] = self.build(*key) if isinstance(key, tuple) else self.build(key)
+        return table
+
+
+# line masks and the lines through each square, keyed (rows, columns, k)
+LINE_MASKS = SizeTable(line_masks)
+CELL_LINES = SizeTable(cell_lines)
+# squares near each square, keyed (rows, columns, distance), see SparseBoard in board.py
+NEIGHBOURS = SizeTable(neighbours)
+
+
+def squares_view(bits, rows, columns):
+    """
+    returns the board as the (rows, columns) grid the game used before bitboards,
+    0 for an empty square, 1 or 2 for the player who marked it
+
+    """
+    squares = np.zeros((rows, columns))
+    for player, mask in enumerate(bits, start=1):
+        for index in iter_bits(mask):
+            squares[index // columns][index % columns] = player
+
+    return squares
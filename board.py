@@ -0,0 +1,273 @@
+# The board model shared by the game modules and the search, without any drawing
+# The game modules subclass BitBoard and add show_win_line, search worker processes use it directly
+# SparseBoard is the same board for the big (gomoku size) boards
+
+from bitboard import CELL_LINES, LINE_MASKS, NEIGHBOURS, iter_bits, square_bit, squares_view
+from symmetry import TRANSFORMS
+from transposition import ZOBRIST_KEYS
+
+
+class BitBoard:
+    def __init__(self, rows, columns, k=None):
+        self.rows = rows
+        self.columns = columns
+        # marks in a row needed to win, the board size unless given
+        self.k = k or min(rows, columns)
+        self.lines = LINE_MASKS[(rows, columns, self.k)]
+        self.cell_lines = CELL_LINES[(rows, columns, self.k)]
+        self.keys = ZOBRIST_KEYS[(rows, columns)]
+        self.transforms = TRANSFORMS[(rows, columns)]
+        # one bitmask per player, see bitboard.py
+        self.bits = [0, 0]
+        self.marked_squares = 0
+        # (square index, player) of every mark in the order they were made
+        self.moves = []
+        # marks each player has in each line, indexed like self.lines
+        self.line_counts = [[0] * len(self.lines), [0] * len(self.lines)]
+        # lines holding marks of both players, which neither can win any more
+        self.dead_lines = 0
+        # Zobrist hash of the board under each of its symmetries, see transposition.py and symmetry.py
+        self.hashes = [0] * len(self.transforms)
+
+    @classmethod
+    def from_bits(cls, bits, rows, columns, k=None):
+        board = cls(rows, columns, k)
+        for player, mask in enumerate(bits, start=1):
+            for row in range(rows):
+                for col in range(columns):
+                    if mask & square_bit(row, col, columns):
+                        board.mark_square(row, col, player)
+
+        return board
+
+    @property
+    def squares(self):
+        # grid view of the bitboards for code that still indexes squares[row][col]
+        return squares_view(self.bits, self.rows, self.columns)
+
+    def winning_state(self, show=False):
+        """
+        returns 0 is there is no win
+        returns 1 if player 1 wins
+        returns 2 if player 2 wins
+
+        """
+        for player in (1, 2):
+            counts = self.line_counts[player - 1]
+            if self.k in counts:
+                if show:
+                    self.show_win_line(counts.index(self.k))
+                return player
+
+        return 0
+
+    def last_move_win(self):
+        """
+        returns the player who made the last move if it completed a line, else 0.
+        Only the lines through that square are checked, which is all the search needs
+        as every position it moves from has no winner yet
+
+        """
+        if not self.moves:
+            return 0
+
+        index, player = self.moves[-1]
+        counts = self.line_counts[player - 1]
+        for line in self.cell_lines[index]:
+            if counts[line] == self.k:
+                return player
+
+        return 0
+
+    def open_lines(self, player, marks):
+        # the lines where the player has exactly marks marks and the other player none
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        return [line for line, count in enumerate(own) if count == marks and not other[line]]
+
+    def winning_squares(self, player):
+        # the empty squares that would complete a line for the player, in row order
+        occupied = self.bits[0] | self.bits[1]
+        squares = set()
+        for line in self.open_lines(player, self.k - 1):
+            squares.update(iter_bits(self.lines[line] & ~occupied))
+
+        return [divmod(square, self.columns) for square in sorted(squares)]
+
+    def show_win_line(self, index):
+        # drawn by the game modules, index is the position of the line in LINE_MASKS
+        pass
+
+    def mark_square(self, row, column, player):
+        self.bits[player - 1] |= square_bit(row, column, self.columns)
+        self.update_hashes(row, column, player)
+        index = row * self.columns + column
+        self.moves.append((index, player))
+        self.marked_squares += 1
+        self.count_mark(index, player)
+
+    def unmark_square(self, row, column):
+        # undoes mark_square so the search can walk a single board
+        bit = square_bit(row, column, self.columns)
+        player = 1 if self.bits[0] & bit else 2
+        self.update_hashes(row, column, player)
+        self.bits[0] &= ~bit
+        self.bits[1] &= ~bit
+        index = row * self.columns + column
+        if self.moves[-1] == (index, player):
+            self.moves.pop()
+        else:
+            self.moves.remove((index, player))
+        self.marked_squares -= 1
+        self.uncount_mark(index, player)
+
+    def count_mark(self, index, player):
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        for line in self.cell_lines[index]:
+            own[line] += 1
+            if own[line] == 1 and other[line]:
+                self.dead_lines += 1
+
+    def uncount_mark(self, index, player):
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        for line in self.cell_lines[index]:
+            if own[line] == 1 and other[line]:
+                self.dead_lines -= 1
+            own[line] -= 1
+
+    def update_hashes(self, row, column, player):
+        keys = self.keys[player - 1]
+        index = row * self.columns + column
+        for transform, perm in enumerate(self.transforms):
+            self.hashes[transform] ^= keys[perm[index]]
+
+    def canonical_key(self):
+        # smallest hash over the symmetries and the transform that produced it
+        key = min(self.hashes)
+        return key, self.hashes.index(key)
+
+    def symmetries(self):
+        # transforms that map the position onto itself
+        return [transform for transform, key in enumerate(self.hashes) if key == self.hashes[0]]
+
+    def empty_square(self, row, col):
+        return not (self.bits[0] | self.bits[1]) & square_bit(row, col, self.columns)
+
+    def get_empty_squares(self):
+        empty_squares = []
+        occupied = self.bits[0] | self.bits[1]
+        for row in range(self.rows):
+            for col in range(self.columns):
+                if not occupied & square_bit(row, col, self.columns):
+                    empty_squares.append((row, col))
+
+        return empty_squares
+
+    def candidate_moves(self):
+        # the squares the search tries, every empty square here, see SparseBoard
+        return self.get_empty_squares()
+
+    def line_marks(self):
+        # (player 1 marks, player 2 marks) of every line holding a mark, lines with none may be included
+        return zip(*self.line_counts)
+
+    def full_board(self):
+        return self.marked_squares == self.rows * self.columns
+
+    def blocked(self):
+        # no line can be won any more, so the game is a draw whatever is played next
+        return self.dead_lines == len(self.lines)
+
+    def empty_board(self):
+        return self.marked_squares == 0
+
+
+class SparseBoard(BitBoard):
+    """
+    BitBoard for the big boards (9x9 to 15x15), where most lines and squares never see a mark.
+    The line counts only hold the lines with marks and the search only tries the empty squares
+    within distance of a mark, so the cost of a node grows with the marks on the board, not its area
+
+    """
+    def __init__(self, rows, columns, k=None, distance=2):
+        super().__init__(rows, columns, k)
+        self.distance = distance
+        self.neighbours = NEIGHBOURS[(rows, columns, distance)]
+        # {line: marks} per player, a line is removed when its last mark is
+        self.line_counts = [{}, {}]
+        # {square: marks within distance}, for the squares with at least one
+        self.near = {}
+
+    @classmethod
+    def from_bits(cls, bits, rows, columns, k=None, distance=2):
+        board = cls(rows, columns, k, distance)
+        for player, mask in enumerate(bits, start=1):
+            for index in iter_bits(mask):
+                board.mark_square(*divmod(index, columns), player)
+
+        return board
+
+    def winning_state(self, show=False):
+        for player in (1, 2):
+            for line, marks in self.line_counts[player - 1].items():
+                if marks == self.k:
+                    if show:
+                        self.show_win_line(line)
+                    return player
+
+        return 0
+
+    def open_lines(self, player, marks):
+        # only lines holding marks are kept, so marks must be at least 1
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        return [line for line, count in own.items() if count == marks and line not in other]
+
+    def count_mark(self, index, player):
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        for line in self.cell_lines[index]:
+            marks = own.get(line, 0) + 1
+            own[line] = marks
+            if marks == 1 and line in other:
+                self.dead_lines += 1
+
+        near = self.near
+        for square in self.neighbours[index]:
+            near[square] = near.get(square, 0) + 1
+
+    def uncount_mark(self, index, player):
+        own, other = self.line_counts[player - 1], self.line_counts[2 - player]
+        for line in self.cell_lines[index]:
+            marks = own[line]
+            if marks == 1:
+                del own[line]
+                if line in other:
+                    self.dead_lines -= 1
+            else:
+                own[line] = marks - 1
+
+        near = self.near
+        for square in self.neighbours[index]:
+            marks = near[square]
+            if marks == 1:
+                del near[square]
+            else:
+                near[square] = marks - 1
+
+    def candidate_moves(self):
+        """
+        returns the empty squares within distance of a mark in row order,
+        or the centre square on an empty board
+
+        """
+        if not self.marked_squares:
+            return [(self.rows // 2, self.columns // 2)]
+
+        occupied = self.bits[0] | self.bits[1]
+        return [divmod(square, self.columns) for square in sorted(self.near) if not occupied >> square & 1]
+
+    def line_marks(self):
+        counts1, counts2 = self.line_counts
+        for line, marks in counts1.items():
+            yield marks, counts2.get(line, 0)
+        for line, marks in counts2.items():
+            if line not in counts1:
+                yield 0, marks
@@ -0,0 +1,123 @@
+# Opening book for 5x5, the first plies have the most empty squares and are the slowest to search
+# Every position up to BOOK_MARKS marks where the AI (player 2) is to move is searched offline,
+# one process per position, and its best move stored
+#
+#   python book.py [seconds per position] [path]
+#
+# Positions are stored once per symmetry class under their canonical form (see symmetry.canonical),
+# as the key player 1 bits | player 2 bits << 25 in a .npy file sorted by key
+
+import os
+import sys
+import time as t
+
+import numpy as np
+
+from board import BitBoard
+from constants import *
+from parallel import get_pool
+from search import AlphaBeta
+from symmetry import canonical, restore_move
+
+BOOK_MARKS = 3
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book5x5.npy')
+
+SQUARES = LARGE_ROWS * LARGE_COLUMNS
+ENTRY_DTYPE = np.dtype([('key', '<u8'), ('move', 'u1'), ('eval', '<f4'), ('depth', 'u1')])
+
+
+def book_key(bits):
+    # canonical key of the position and the transform that maps the board onto its canonical form
+    form, transform = canonical(bits, LARGE_ROWS, LARGE_COLUMNS)
+    return form[0] | form[1] << SQUARES, transform
+
+
+def book_positions(max_marks=BOOK_MARKS):
+    """
+    one position (in canonical form) per symmetry class with up to max_marks marks, player 1 first,
+    keeping only those with an odd number of marks, the AI's turn in the game
+
+    """
+    positions = {}
+    seen = {0}
+    layer = [(0, 0)]
+    for marks in range(max_marks):
+        player = marks % 2
+        next_layer = []
+        for bits in layer:
+            for index in range(SQUARES):
+                if not (bits[0] | bits[1]) >> index & 1:
+                    child = list(bits)
+                    child[player] |= 1 << index
+                    key = book_key(child)[0]
+                    if key not in seen:
+                        seen.add(key)
+                        form = (key & ((1 << SQUARES) - 1), key >> SQUARES)
+                        next_layer.append(form)
+                        if marks % 2 == 0:
+                            positions[key] = form
+        layer = next_layer
+
+    return positions
+
+
+def book_search(bits, time_limit):
+    """
+    runs in a worker process, searches one position for time_limit seconds
+    and returns its eval, move and the depth that finished
+
+    """
+    board = BitBoard.from_bits(bits, LARGE_ROWS, LARGE_COLUMNS)
+    searcher = AlphaBeta(LARGE_ROWS, LARGE_COLUMNS)
+    maximizing = board.marked_squares % 2 == 0
+    ai_eval, move = searcher.iterative_deepening(board, maximizing, time_limit)
+    return ai_eval, move, searcher.max_depth
+
+
+def build(time_limit=10, path=BOOK_PATH, max_marks=BOOK_MARKS, workers=None):
+    start = t.time()
+    positions = book_positions(max_marks)
+    keys = sorted(positions)
+
+    pool = get_pool(workers or os.cpu_count() or 1)
+    futures = [pool.submit(book_search, list(positions[key]), time_limit) for key in keys]
+
+    entries = np.zeros(len(keys), dtype=ENTRY_DTYPE)
+    for index, (key, future) in enumerate(zip(keys, futures)):
+        ai_eval, move, depth = future.result()
+        # the positions are already in canonical form, so the move is stored as found
+        entries[index] = (key, move[0] * LARGE_COLUMNS + move[1], ai_eval, depth)
+        print(f'{index + 1}/{len(keys)} {move} eval {round(ai_eval, 4)} depth {depth}')
+
+    np.save(path, entries)
+    print(f'{len(keys)} positions written to {path} in {round(t.time() - start, 2)} seconds')
+
+
+class OpeningBook:
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        self.entries = np.load(path)
+
+    def probe(self, board):
+        """
+        returns the eval, move and search depth stored for the position,
+        or None when it is not in the book
+
+        """
+        key, transform = book_key(board.bits)
+        index = int(np.searchsorted(self.entries['key'], np.uint64(key)))
+        if index == len(self.entries) or self.entries['key'][index] != key:
+            return None
+
+        entry = self.entries[index]
+        move = restore_move(divmod(int(entry['move']), LARGE_COLUMNS), transform, LARGE_ROWS, LARGE_COLUMNS)
+        return float(entry['eval']), move, int(entry['depth'])
+
+
+def open_book(path=BOOK_PATH):
+    # the OpeningBook for the file, or None when it has not been built
+    return OpeningBook(path) if os.path.exists(path) else None
+
+
+if __name__ == '__main__':
+    build(float(sys.argv[1]) if len(sys.argv) > 1 else 10, *sys.argv[2:3])
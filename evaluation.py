@@ -0,0 +1,36 @@
+# Static evaluation for positions where the search stops at its depth cap
+# Every line still open to a player (no opposing marks) scores by how many marks that player has in it,
+# a line one mark short of a win is a threat and weighs the most
+
+from bitboard import LINE_MASKS
+
+
+def line_weights(length):
+    # weight of an open line holding 0, 1, ... length marks
+    return [0] + [4 ** (marks - 1) for marks in range(1, length + 1)]
+
+
+class Evaluator:
+    def __init__(self, rows, columns, k=None):
+        k = k or min(rows, columns)
+        self.lines = LINE_MASKS[(rows, columns, k)]
+        self.weights = line_weights(k)
+        # keeps every score strictly between -1 and 1 so a real win or loss always counts for more
+        self.scale = len(self.lines) * self.weights[-1] + 1
+
+    def evaluate(self, board):
+        """
+        returns a score strictly between -1 and 1,
+        positive when player 1 (the maximizing player) has the better open lines.
+        Reads the line counts the board keeps up to date, see BitBoard.mark_square
+
+        """
+        weights = self.weights
+        score = 0
+        for marks1, marks2 in board.line_marks():
+            if not marks2:
+                score += weights[marks1]
+            elif not marks1:
+                score -= weights[marks2]
+
+        return score / self.scale
@@ -0,0 +1,408 @@
+# The pygame front end shared by every board size, the human is player 1 and the AI player 2
+# The size modules (ticTacToe.py, fourByFourBoardAlphaBeta.py ...) pick the board, the AI and the figures,
+# any other size can be played straight from here:
+#
+#   python game.py size [k]     e.g. python game.py 6 4 for 4 in a row on a 6x6 board
+#                               or python game.py 15 5 for gomoku, from GOMOKU_SIZE on the board is a GomokuBoard
+
+import sys
+import random
+import threading
+import time as t
+
+import pygame
+
+from bitboard import iter_bits
+from board import BitBoard, SparseBoard
+from constants import *
+from lazysmp import LazySMP
+from mcts import MCTS
+from parallel import RootSplitter
+from search import AlphaBeta
+from threats import ThreatSearch, forced_move
+
+FPS = 2.5
+# frames per second of the main loop, kept while the AI thinks on its own thread (see AIWorker)
+FRAME_RATE = 60
+# smallest board played on a GomokuBoard
+GOMOKU_SIZE = 9
+
+# set up by main, the search worker processes never open a window
+screen = None
+
+
+class WinSprite(pygame.sprite.Sprite):
+    def __init__(self):
+        super(WinSprite, self).__init__()
+        self.images = [pygame.image.load('Images/Small_winner.png'),
+                       pygame.image.load('Images/Med_winner.png'),
+                       pygame.image.load('Images/Big_winner.png')]
+        self.index = 0
+        self.rect = pygame.Rect(0, 0, 600, 600)
+
+    def update(self):
+        if self.index >= len(self.images):
+            self.index = 0
+        self.image = self.images[self.index]
+        self.index += 1
+
+
+class TieSprite(pygame.sprite.Sprite):
+    def __init__(self):
+        super(TieSprite, self).__init__()
+        self.images = [pygame.image.load('Images/Small_tie.png'),
+                       pygame.image.load('Images/Med_tie.png'),
+                       pygame.image.load('Images/Big_tie.png')]
+        self.index = 0
+        self.rect = pygame.Rect(0, 0, 600, 600)
+
+    def update(self):
+        if self.index >= len(self.images):
+            self.index = 0
+        self.image = self.images[self.index]
+        self.index += 1
+
+
+class Board(BitBoard):
+    def show_win_line(self, index):
+        """
+        draws the line through the winning squares, from 20 pixels inside the board
+        when the line reaches the edge, the same way for every size and k
+
+        """
+        square_size = WIDTH // self.columns
+        squares = list(iter_bits(self.lines[index]))
+        first_row, first_col = divmod(squares[0], self.columns)
+        last_row, last_col = divmod(squares[-1], self.columns)
+        # direction of the line, -1, 0 or 1 along each axis
+        d_row = (last_row > first_row) - (last_row < first_row)
+        d_col = (last_col > first_col) - (last_col < first_col)
+        overhang = square_size // 2 - 20
+
+        i_pos = (first_col * square_size + square_size // 2 - d_col * overhang,
+                 first_row * square_size + square_size // 2 - d_row * overhang)
+        f_pos = (last_col * square_size + square_size // 2 + d_col * overhang,
+                 last_row * square_size + square_size // 2 + d_row * overhang)
+
+        pygame.draw.line(screen, LINE_COLOUR, i_pos, f_pos, LINE_WIDTH)
+
+
+class GomokuBoard(SparseBoard, Board):
+    # the big boards, the search only tries squares near the marks, see SparseBoard in board.py
+    pass
+
+
+def rand_choice(board):
+    empty_squares = board.get_empty_squares()
+    index = random.randrange(0, len(empty_squares))
+    return empty_squares[index]
+
+
+class AI(AlphaBeta):
+    def __init__(self, rows, columns, k=None, level=1, player=2, time_limit=2, engine='serial', max_depth=None):
+        super().__init__(rows, columns, player, max_depth, k)
+        self.level = level
+        # seconds the AI may spend on one move, see iterative_deepening in search.py
+        self.time_limit = time_limit
+        # 'serial', 'split' (the root moves over every core, see parallel.py),
+        # 'smp' (lazy SMP over every core, see lazysmp.py) or 'mtdf' (serial, see AlphaBeta.mtdf)
+        self.smp = None
+        # level 2, Monte Carlo Tree Search, see mcts.py
+        self.mcts = MCTS(rows, columns, player, batch=64, k=k)
+        # set by the game to stop a search that is no longer wanted, read by every search below
+        self.token = threading.Event()
+        self.mcts.token = self.token
+        # best moves for the first plies, see book.py
+        self.book = None
+        # forced wins by threats, looked for before the full width search on 5x5 and up, see threats.py
+        self.threats = ThreatSearch() if min(rows, columns) >= 5 else None
+        # solves the position when the search ends unresolved, see pns.py
+        self.pns = None
+        # moves made and how many of them were a win in one or a forced block played without searching
+        self.moves_made = 0
+        self.shortcuts = 0
+        if engine == 'split':
+            self.splitter = RootSplitter()
+        elif engine == 'smp':
+            self.smp = LazySMP()
+        elif engine == 'mtdf':
+            self.mtd = True
+
+    def eval(self, game_board):
+        start = t.time()
+        self.orderer.age()
+        self.moves_made += 1
+        # a win in one or the only square that stops the human winning is played without searching
+        forced, winning = forced_move(game_board, self.player) if self.level != 0 else (None, False)
+        if forced is not None:
+            self.shortcuts += 1
+        book_entry = None
+        if self.book is not None and self.level == 1 and forced is None:
+            book_entry = self.book.probe(game_board)
+        # the proof number search may follow the search, each gets half the time then, see pns.py
+        fallback = self.pns is not None and self.level == 1 and forced is None and \
+            game_board.marked_squares >= self.pns.min_marks
+        search_time = self.time_limit / 2 if fallback else self.time_limit
+        threat_move = None
+        if self.threats is not None and self.level == 1 and forced is None and book_entry is None:
+            threat_move = self.threats.forced_win(game_board, self.player)
+            if threat_move is None:
+                # only the moves that stop the human's threats are searched, when there are any
+                self.root_moves = self.threats.defences(game_board, self.player)
+
+        if self.level == 0:
+            ai_eval = 'random'
+            move = rand_choice(game_board)
+        elif forced is not None:
+            ai_eval = (1 if self.player == 1 else -1) if winning else 'forced block'
+            move = forced
+        elif self.level == 2:
+            win_rate, move = self.mcts.search(game_board, False, self.time_limit)
+            # the AI's expected score in [0, 1] (draws count half) as a score for player 1 in [-1, 1]
+            ai_eval = 2 * win_rate - 1 if self.player == 1 else 1 - 2 * win_rate
+        elif book_entry is not None:
+            # searched offline to the stored depth, see book.py
+            ai_eval, move, self.max_depth = book_entry
+        elif threat_move is not None:
+            ai_eval, move = (1 if self.player == 1 else -1), threat_move
+        elif self.smp is not None:
+            ai_eval, move = self.smp.iterative_deepening(self, game_board, False, search_time)
+        else:
+            ai_eval, move = self.iterative_deepening(game_board, False, search_time)
+        self.root_moves = None
+        if self.token.is_set():
+            # cancelled, the game has moved on
+            return None
+
+        proven = False
+        time_left = start + self.time_limit - t.time()
+        if fallback and book_entry is None and abs(ai_eval) < 1 and time_left > 0 and \
+                self.max_depth < self.rows * self.columns - game_board.marked_squares:
+            # the search stopped short of the end of the game, the proof number search has no depth cap
+            self.pns.token = self.token
+            value, proven_move = self.pns.solve(game_board, time_left)
+            if self.token.is_set():
+                return None
+            if value is not None:
+                ai_eval, proven = value, True
+                # a lost position comes back without a move, every move loses and the search's one stands
+                if proven_move is not None:
+                    move = proven_move
+
+        end = t.time()
+        print(f'AI has chosen to mark the square in position {move}')
+        print(f'Eval = {ai_eval}')
+        if forced is not None:
+            print(f'Depth = 0 ({"win" if winning else "block"} without search, '
+                  f'{self.shortcuts} of {self.moves_made} moves so far)')
+        elif book_entry is not None:
+            print(f'Depth = {self.max_depth} (opening book)')
+        elif threat_move is not None:
+            print('Depth = forced win by threats')
+        elif proven:
+            print(f'Depth = {self.max_depth}, solved by proof number search ({self.pns.expanded} nodes expanded)')
+        elif self.level == 1:
+            print(f'Depth = {self.max_depth}')
+        elif self.level == 2:
+            print(f'Playouts = {self.mcts.playouts}')
+        print(f'Eval Time = {round(end - start, 7)}\n')
+
+        return move
+
+
+class AIWorker:
+    def __init__(self, ai, board):
+        """
+        runs ai.eval on a thread so the window keeps drawing and handling events while the AI thinks.
+        The board is the game's own, nothing else touches it until the move is in.
+        An AI without a token (ticTacToe.AI answers from a table) just runs to the end
+
+        """
+        self.ai = ai
+        self.token = getattr(ai, 'token', None)
+        if self.token is not None:
+            self.token.clear()
+        self.move = None
+        self.thread = threading.Thread(target=self.run, args=(board,), daemon=True)
+        self.thread.start()
+
+    def run(self, board):
+        self.move = self.ai.eval(board)
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def cancel(self):
+        # stops the search and waits for it to let go of the board, the move is thrown away
+        if self.token is not None:
+            self.token.set()
+        self.thread.join()
+
+
+class Game:
+    def __init__(self, make_board, make_ai, figures):
+        """
+        make_board and make_ai build a fresh board and AI for every game,
+        figures is the (image path, size or None to keep the image size) drawn for each player
+
+        """
+        self.make_board = make_board
+        self.make_ai = make_ai
+        self.figures = figures
+        self.board = make_board()
+        self.ai = make_ai()
+        self.square_size = WIDTH // self.board.columns
+        self.player = 1
+        self.running = True
+        self.show_lines()
+
+    def show_lines(self):
+        screen.fill(BACKGROUND_COLOUR)
+        for index in range(1, self.board.columns):
+            # Vertical
+            pygame.draw.line(screen, LINE_COLOUR, (index * self.square_size, 0), (index * self.square_size, HEIGHT),
+                             LINE_WIDTH)
+        for index in range(1, self.board.rows):
+            # Horizontal
+            pygame.draw.line(screen, LINE_COLOUR, (0, index * self.square_size), (WIDTH, index * self.square_size),
+                             LINE_WIDTH)
+
+    def draw_fig(self, row, col):
+        path, size = self.figures[self.player - 1]
+        figure = pygame.image.load(path)
+        if size is not None:
+            figure = pygame.transform.scale(figure, size)
+        figure.convert()
+
+        figure_rect = figure.get_rect()
+
+        figure_rect.center = (col * self.square_size + self.square_size // 2,
+                              row * self.square_size + self.square_size // 2)
+        screen.blit(figure, figure_rect)
+        pygame.draw.rect(screen, BACKGROUND_COLOUR, figure_rect, 1)
+
+    def make_move(self, row, col):
+        self.board.mark_square(row, col, self.player)
+        self.draw_fig(row, col)
+        self.next_player()
+
+    def next_player(self):
+        self.player = self.player % 2 + 1
+
+    def is_over(self):
+        return self.board.winning_state(show=True) != 0 or self.board.full_board()
+
+    def reset(self):
+        self.__init__(self.make_board, self.make_ai, self.figures)
+
+
+def show_result(game):
+    """
+    plays the win (AI won) or tie animation until a key is pressed and starts a new game.
+    A win by the human only leaves the winning line on the board, 'r' starts a new game
+
+    """
+    game.running = False
+    winner = game.board.winning_state()
+    if winner == 0:
+        sprite = TieSprite()
+    elif winner == game.ai.player:
+        sprite = WinSprite()
+    else:
+        return
+
+    group = pygame.sprite.Group(sprite)
+    clock = pygame.time.Clock()
+    background = screen.copy()
+    loop = 1
+    while loop:
+        for e in pygame.event.get():
+            if e.type == pygame.KEYDOWN:
+                sprite.kill()
+                game.reset()
+                loop = 0
+            elif e.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
+        if loop:
+            screen.blit(background, (0, 0))
+            group.update()
+            group.draw(screen)
+            pygame.display.flip()
+            clock.tick(FPS)
+
+
+def main(make_board, make_ai, figures, caption='Tic Tac Toe Alpha-Beta'):
+    global screen
+
+    # Game setup
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(caption)
+    screen.fill(BACKGROUND_COLOUR)
+
+    game = Game(make_board, make_ai, figures)
+    clock = pygame.time.Clock()
+    # the AI's search while it is thinking, see AIWorker
+    worker = None
+
+    # main game loop
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                if worker is not None:
+                    worker.cancel()
+                pygame.quit()
+                sys.exit()
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    if worker is not None:
+                        worker.cancel()
+                        worker = None
+                    game.reset()
+
+                if event.key == pygame.K_0:
+                    game.ai.level = 0
+
+                if event.key == pygame.K_1:
+                    game.ai.level = 1
+
+                if event.key == pygame.K_2:
+                    game.ai.level = 2
+
+            if event.type == pygame.MOUSEBUTTONDOWN and game.player == 1 and game.running and worker is None:
+                pos = event.pos
+                row = pos[1] // game.square_size
+                col = pos[0] // game.square_size
+
+                if game.board.empty_square(row, col):
+                    game.make_move(row, col)
+
+                    if game.is_over():
+                        show_result(game)
+
+                if game.player == game.ai.player and game.running:
+                    # AI methods, the human's move is drawn on the next frame while the search runs
+                    worker = AIWorker(game.ai, game.board)
+
+        if worker is not None and worker.done():
+            row, col = worker.move
+            worker = None
+            game.make_move(row, col)
+
+            if game.is_over():
+                show_result(game)
+
+        pygame.display.update()
+        clock.tick(FRAME_RATE)
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    # the figures shrink with the squares on the bigger boards
+    figure_size = min(100, WIDTH // size - 20)
+    board_class = GomokuBoard if size >= GOMOKU_SIZE else Board
+    main(lambda: board_class(size, size, k), lambda: AI(size, size, k),
+         (('Images/husky.png', (figure_size, figure_size)), ('Images/cat.png', (figure_size, figure_size))))
@@ -0,0 +1,175 @@
+# Lazy SMP, several processes run the same iterative deepening search on one shared transposition table
+# The helper processes order their moves a little differently, so between them they fill the table
+# with positions the main search reaches soon after and can then take straight from the table
+
+import os
+import random
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from board import BitBoard
+from parallel import get_pool
+from search import AlphaBeta
+from tablebase import open_tablebase
+from transposition import Entry, bound_flag
+
+# Every slot holds the packed entry (data) and key ^ data (lock). A slot written by two processes at once
+# no longer satisfies lock ^ data == key, so a torn entry reads as a miss instead of a wrong score
+ENTRY_DTYPE = np.dtype([('lock', '<u8'), ('data', '<u8')])
+
+NO_MOVE = 255
+# set in every stored entry so an empty slot never matches
+VALID = 1 << 56
+
+# shared tables the helper processes have attached to, by name
+_tables = {}
+# tables this process created, a worker forked from it inherits them still mapped
+_created = weakref.WeakSet()
+
+
+class SharedTable:
+    def __init__(self, columns, scale, entries=1 << 20, name=None):
+        """
+        a fixed size transposition table in shared memory with the same probe/store methods as
+        TranspositionTable, entries must be a power of 2.
+        Scores are kept as whole multiples of 1 / scale (Evaluator.scale), which every eval is,
+        so they come back exactly as stored.
+        Passing the name of an existing table attaches to it instead of creating one.
+        The byte after the entries is the stop flag for the helper searches
+
+        """
+        self.columns = columns
+        self.scale = scale
+        self.size = entries
+        self.mask = entries - 1
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=entries * ENTRY_DTYPE.itemsize + 1)
+            weakref.finalize(self, self.memory.unlink)
+            _created.add(self)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+        self.name = self.memory.name
+        slots = np.ndarray((entries,), dtype=ENTRY_DTYPE, buffer=self.memory.buf)
+        self.locks = slots['lock']
+        self.data = slots['data']
+        self.flag = np.ndarray((1,), dtype=np.uint8, buffer=self.memory.buf, offset=entries * ENTRY_DTYPE.itemsize)
+
+    def probe(self, key):
+        slot = key & self.mask
+        data = int(self.data[slot])
+        if not data & VALID or int(self.locks[slot]) ^ data != key:
+            return None
+
+        score = data & 0xFFFFFFFF
+        if score >= 1 << 31:
+            score -= 1 << 32
+        score /= self.scale
+        depth = (data >> 32) & 0xFF
+        flag = (data >> 40) & 0xFF
+        index = (data >> 48) & 0xFF
+        move = None if index == NO_MOVE else divmod(index, self.columns)
+        return Entry(depth, score, flag, move)
+
+    def store(self, key, depth, score, alpha, beta, move):
+        flag = bound_flag(score, alpha, beta)
+        index = NO_MOVE if move is None else move[0] * self.columns + move[1]
+        score = round(score * self.scale) & 0xFFFFFFFF
+        data = score | depth << 32 | flag << 40 | index << 48 | VALID
+
+        slot = key & self.mask
+        self.data[slot] = data
+        self.locks[slot] = key ^ data
+
+    def close(self):
+        # the views on the memory go first, it cannot be closed while they exist
+        self.locks = self.data = self.flag = None
+        self.memory.close()
+
+    def clear(self):
+        self.locks[:] = 0
+        self.data[:] = 0
+
+    # stop flag, read by the helper searches through AlphaBeta.token
+    def is_set(self):
+        return bool(self.flag[0])
+
+    def set(self):
+        self.flag[0] = 1
+
+    def reset(self):
+        self.flag[0] = 0
+
+
+def smp_helper(name, entries, rows, columns, k, player, bits, maximizing, time_limit, seed, evaluator,
+               tablebase=None):
+    """
+    runs in a worker process, searches the position until the time runs out or the main search
+    sets the stop flag, only to fill the shared table. Returns how many nodes it searched
+
+    """
+    searcher = AlphaBeta(rows, columns, player, k=k)
+    # the main search's evaluator, so both store scores of the same scale
+    searcher.evaluator = evaluator
+    # tables of earlier games, every new AI makes a new table and unlinks its old one,
+    # which stays mapped in this process until it is closed here
+    for old in [old for old in _tables if old != name]:
+        _tables.pop(old).close()
+    for inherited in list(_created):
+        _created.discard(inherited)
+        inherited.close()
+    table = _tables.get(name)
+    if table is None:
+        table = SharedTable(columns, searcher.evaluator.scale, entries, name)
+        _tables[name] = table
+
+    searcher.table = table
+    searcher.token = table
+    searcher.tablebase = open_tablebase(tablebase) if tablebase is not None else None
+
+    # a different move order per helper so they do not all search the same nodes
+    rng = random.Random(seed)
+    searcher.orderer.prior = [prior + rng.random() for prior in searcher.orderer.prior]
+
+    board = BitBoard.from_bits(bits, rows, columns, k)
+    searcher.iterative_deepening(board, maximizing, time_limit)
+
+    return searcher.nodes
+
+
+class LazySMP:
+    def __init__(self, workers=None, entries=1 << 20):
+        # the main search counts as one of the workers
+        self.workers = workers or os.cpu_count() or 1
+        self.entries = entries
+        self.table = None
+
+    def iterative_deepening(self, searcher, board, maximizing, time_limit):
+        """
+        runs searcher.iterative_deepening with the helpers searching alongside it
+        and returns its eval and move
+
+        """
+        if self.table is None:
+            self.table = SharedTable(searcher.columns, searcher.evaluator.scale, self.entries)
+        searcher.table = self.table
+        self.table.reset()
+
+        futures = []
+        if self.workers > 1:
+            pool = get_pool(self.workers - 1)
+            for seed in range(1, self.workers):
+                futures.append(pool.submit(smp_helper, self.table.name, self.entries, searcher.rows, searcher.columns,
+                                           searcher.k, searcher.player, list(board.bits), maximizing, time_limit, seed,
+                                           searcher.evaluator,
+                                           searcher.tablebase.path if searcher.tablebase is not None else None))
+
+        result = searcher.iterative_deepening(board, maximizing, time_limit)
+
+        self.table.set()
+        for future in futures:
+            searcher.nodes += future.result()
+
+        return result
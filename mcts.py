@@ -0,0 +1,177 @@
+# Monte Carlo Tree Search (UCT), the AI level 2 engine for the larger boards
+# The tree lives in preallocated numpy arrays indexed by node number instead of one Python object per node,
+# the children of a node are stored next to each other so selection scores them in one vectorized step
+
+import math
+import random
+import time as t
+
+import numpy as np
+
+from bitboard import LINE_MASKS, iter_bits
+from playouts import random_playouts
+
+DRAW = 3
+
+
+class MCTS:
+    def __init__(self, rows, columns, player=2, max_nodes=1 << 18, exploration=1.4, batch=0, k=None):
+        self.rows = rows
+        self.columns = columns
+        self.player = player
+        self.k = k or min(rows, columns)
+        self.lines = LINE_MASKS[(rows, columns, self.k)]
+        self.full = (1 << (rows * columns)) - 1
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        # playouts per leaf with the numpy backend (see playouts.py), 0 plays one game in pure Python
+        self.batch = batch
+        self.rng = np.random.default_rng()
+        # stops the search when set, anything with an is_set method
+        self.token = None
+
+        # node pool
+        self.visits = np.zeros(max_nodes, dtype=np.int32)
+        self.wins = np.zeros(max_nodes, dtype=np.float64)  # from the view of the player who moved into the node
+        self.move = np.zeros(max_nodes, dtype=np.int16)  # square index of the move into the node
+        self.mover = np.zeros(max_nodes, dtype=np.int8)  # player who made that move
+        self.first_child = np.zeros(max_nodes, dtype=np.int32)
+        self.child_count = np.zeros(max_nodes, dtype=np.int16)
+        self.size = 0
+        self.playouts = 0
+
+    def has_line(self, mask):
+        for line in self.lines:
+            if (mask & line) == line:
+                return True
+        return False
+
+    def result(self, bits, last_mover):
+        # 0 while the game goes on, else the winner or DRAW
+        if last_mover and self.has_line(bits[last_mover - 1]):
+            return last_mover
+        if (bits[0] | bits[1]) == self.full:
+            return DRAW
+        return 0
+
+    def new_node(self, move, mover):
+        node = self.size
+        self.size += 1
+        self.visits[node] = 0
+        self.wins[node] = 0
+        self.move[node] = move
+        self.mover[node] = mover
+        self.child_count[node] = 0
+        return node
+
+    def expand(self, node, bits, to_move):
+        empty = self.full & ~(bits[0] | bits[1])
+        first = self.size
+        for index in iter_bits(empty):
+            self.new_node(index, to_move)
+        self.first_child[node] = first
+        self.child_count[node] = self.size - first
+
+    def select(self, node):
+        # UCT over the children block, unvisited children first
+        first = self.first_child[node]
+        visits = self.visits[first:first + self.child_count[node]]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return first + int(unvisited[0])
+
+        scores = self.wins[first:first + len(visits)] / visits \
+            + self.exploration * np.sqrt(math.log(self.visits[node]) / visits)
+        return first + int(np.argmax(scores))
+
+    def playout(self, bits, to_move):
+        # plays random moves to the end of the game and returns the winner or DRAW
+        empty = list(iter_bits(self.full & ~(bits[0] | bits[1])))
+        random.shuffle(empty)
+        for index in empty:
+            bits[to_move - 1] |= 1 << index
+            if self.has_line(bits[to_move - 1]):
+                return to_move
+            to_move = 3 - to_move
+
+        return DRAW
+
+    def simulate(self, bits, to_move):
+        # returns how many games were played and how many ended in each outcome, indexed by outcome
+        if self.batch:
+            outcome = random_playouts(bits, to_move, self.rows, self.columns, self.batch, self.rng, self.k)
+            return self.batch, np.bincount(outcome, minlength=DRAW + 1)
+
+        counts = [0] * (DRAW + 1)
+        counts[self.playout(bits, to_move)] = 1
+        return 1, counts
+
+    def iterate(self, root_bits, root_to_move):
+        bits = list(root_bits)
+        to_move = root_to_move
+        node = 0
+        path = [0]
+
+        # selection
+        while self.child_count[node] > 0:
+            node = self.select(node)
+            bits[to_move - 1] |= 1 << int(self.move[node])
+            to_move = 3 - to_move
+            path.append(node)
+
+        outcome = self.result(bits, 3 - to_move if node else 0)
+
+        # expansion, once a leaf has been visited and while the pool has room
+        if not outcome and self.visits[node] > 0 and self.size + self.rows * self.columns <= self.max_nodes:
+            self.expand(node, bits, to_move)
+            node = self.first_child[node]
+            bits[to_move - 1] |= 1 << int(self.move[node])
+            to_move = 3 - to_move
+            path.append(node)
+            outcome = self.result(bits, 3 - to_move)
+
+        # simulation
+        if outcome:
+            games = 1
+            counts = [0] * (DRAW + 1)
+            counts[outcome] = 1
+        else:
+            games, counts = self.simulate(bits, to_move)
+        self.playouts += games
+
+        # backpropagation
+        for node in path:
+            self.visits[node] += games
+            self.wins[node] += counts[self.mover[node]] + 0.5 * counts[DRAW]
+
+    def search(self, board, maximizing, time_limit=None, iterations=None):
+        """
+        runs playouts from the board until time_limit seconds or the iteration budget is used up,
+        whichever comes first, and returns the win rate and move of the most visited root move
+
+        """
+        to_move = 1 if maximizing else self.player
+        self.size = 0
+        self.playouts = 0
+        self.new_node(-1, 3 - to_move)
+        self.expand(0, board.bits, to_move)
+
+        if time_limit is None and iterations is None:
+            iterations = 10000
+        deadline = t.time() + time_limit if time_limit is not None else None
+        count = 0
+        while iterations is None or count < iterations:
+            self.iterate(board.bits, to_move)
+            count += 1
+            if count % 64 == 0:
+                if deadline is not None and t.time() > deadline:
+                    break
+                if self.token is not None and self.token.is_set():
+                    break
+
+        first = self.first_child[0]
+        visits = self.visits[first:first + self.child_count[0]]
+        best = first + int(np.argmax(visits))
+        win_rate = float(self.wins[best] / max(self.visits[best], 1))
+
+        return win_rate, divmod(int(self.move[best]), self.columns)
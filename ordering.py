@@ -0,0 +1,73 @@
+# Move ordering for the alpha-beta search
+# Good moves searched first make alpha-beta cut off sooner, the order used is
+# hash move, killer moves, then history score plus a static centre / line count prior
+
+from bitboard import LINE_MASKS, square_bit
+
+
+def square_prior(rows, columns, k):
+    """
+    returns a static score per square, the number of winning lines through it
+    with the distance from the centre as a tie break
+
+    """
+    lines = LINE_MASKS[(rows, columns, k)]
+    centre_row = (rows - 1) / 2
+    centre_col = (columns - 1) / 2
+    prior = []
+    for row in range(rows):
+        for col in range(columns):
+            bit = square_bit(row, col, columns)
+            line_count = sum(1 for mask in lines if mask & bit)
+            distance = abs(row - centre_row) + abs(col - centre_col)
+            prior.append(line_count - distance / (rows + columns))
+
+    return prior
+
+
+class MoveOrderer:
+    def __init__(self, rows, columns, k=None):
+        self.columns = columns
+        self.prior = square_prior(rows, columns, k or min(rows, columns))
+        # two killer moves per ply, the last moves that caused a cutoff there
+        self.killers = {}
+        # how much each square has caused cutoffs, weighted by remaining depth
+        self.history = [0] * (rows * columns)
+
+    def order(self, moves, ply, hash_move=None):
+        killers = self.killers.get(ply, ())
+
+        def score(move):
+            if move == hash_move:
+                return 3, 0
+            if move in killers:
+                return 2, -killers.index(move)
+            index = move[0] * self.columns + move[1]
+            return 1, self.history[index] + self.prior[index]
+
+        return sorted(moves, key=score, reverse=True)
+
+    def order_root(self, moves, pv_move=None):
+        """
+        orders the root moves by the best move of the depth before and the prior only.
+        Killers and history come from the cutoffs below the root, which the root splitter's workers
+        keep to themselves (see parallel.py), so leaving them out gives the serial and the split search
+        the same root order at every depth
+
+        """
+        def score(move):
+            return move == pv_move, self.prior[move[0] * self.columns + move[1]]
+
+        return sorted(moves, key=score, reverse=True)
+
+    def cutoff(self, move, ply, depth):
+        # called when move caused a beta cutoff with depth plies left to search
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[move[0] * self.columns + move[1]] += depth * depth
+
+    def age(self):
+        # older cutoffs count for less once the game has moved on
+        self.history = [score // 2 for score in self.history]
@@ -0,0 +1,172 @@
+# Parallel root search, the root moves of one alpha-beta search are split over a pool of processes
+# The pool is created once and kept for the rest of the program so a move does not pay for starting workers
+#
+#   python parallel.py [positions] [workers]
+#
+# checks that the split search picks the same eval and move as the serial one under iterative deepening
+
+import math
+import os
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from board import BitBoard
+from search import AlphaBeta
+from tablebase import open_tablebase
+
+_pool = None
+_pool_workers = 0
+
+# one searcher per board size, k and player in each worker process, kept across tasks so its tables stay warm
+_searchers = {}
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+
+    return _pool
+
+
+def search_root_move(bits, rows, columns, k, player, move, maximizing, alpha, beta, max_depth, deadline,
+                     tablebase=None):
+    """
+    runs in a worker process, searches the position after one root move
+    and returns its eval, whether the time ran out and how many nodes it took
+
+    """
+    searcher = _searchers.get((rows, columns, k, player))
+    if searcher is None:
+        searcher = AlphaBeta(rows, columns, player, k=k)
+        _searchers[(rows, columns, k, player)] = searcher
+
+    searcher.max_depth = max_depth
+    searcher.tablebase = open_tablebase(tablebase) if tablebase is not None else None
+    searcher.deadline = deadline
+    searcher.stopped = False
+    searcher.nodes = 0
+
+    board = BitBoard.from_bits(bits, rows, columns, k)
+    board.mark_square(move[0], move[1], 1 if maximizing else player)
+    ai_eval = searcher.minimax(board, alpha, beta, not maximizing, 1)[0]
+
+    return ai_eval, searcher.stopped, searcher.nodes
+
+
+class RootSplitter:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def search_root(self, searcher, board, moves, alpha, beta, maximizing):
+        """
+        searches the root moves (already ordered) in parallel and returns the eval and move that
+        the serial loop in AlphaBeta.minimax would pick from the same moves.
+        Every task starts with the bound from the results in so far, which all come from earlier moves,
+        and the best move is then picked walking the results in move order
+
+        """
+        pool = get_pool(self.workers)
+        root_alpha, root_beta = alpha, beta
+        results = {}
+        pending = {}
+        next_move = 0
+        cutoff = False
+
+        while pending or (next_move < len(moves) and not cutoff):
+            while next_move < len(moves) and len(pending) < self.workers and not cutoff:
+                future = pool.submit(search_root_move, list(board.bits), board.rows, board.columns, board.k,
+                                     searcher.player, moves[next_move], maximizing, alpha, beta, searcher.max_depth,
+                                     searcher.deadline,
+                                     searcher.tablebase.path if searcher.tablebase is not None else None)
+                pending[future] = next_move
+                next_move += 1
+
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            if searcher.token is not None and searcher.token.is_set():
+                # the moves already running finish in their workers and are thrown away
+                for future in pending:
+                    future.cancel()
+                searcher.stopped = True
+                break
+            for future in done:
+                index = pending.pop(future)
+                ai_eval, stopped, nodes = future.result()
+                searcher.nodes += nodes
+                if stopped:
+                    searcher.stopped = True
+                results[index] = ai_eval
+
+                if maximizing:
+                    alpha = max(alpha, ai_eval)
+                else:
+                    beta = min(beta, ai_eval)
+                if beta <= alpha:
+                    cutoff = True
+
+        alpha, beta = root_alpha, root_beta
+        best_eval = -math.inf if maximizing else math.inf
+        best_move = None
+        for index, move in enumerate(moves):
+            if index not in results:
+                break
+            ai_eval = results[index]
+            if maximizing:
+                if ai_eval > best_eval:
+                    best_eval = ai_eval
+                    best_move = move
+                alpha = max(alpha, ai_eval)
+            else:
+                if ai_eval < best_eval:
+                    best_eval = ai_eval
+                    best_move = move
+                beta = min(beta, ai_eval)
+            if beta <= alpha:
+                break
+
+        return best_eval, best_move
+
+
+def check(positions=30, workers=3, time_limit=60, seed=0):
+    """
+    searches random 4x4 and 5x5 positions by iterative deepening with a serial and a split searcher,
+    both kept across positions as AI.eval keeps them, and prints every position where they differ
+
+    """
+    random.seed(seed)
+    searchers = {}
+    differ = 0
+    for index in range(positions):
+        size, depth_limit = (4, 7) if index % 2 == 0 else (5, 5)
+        board = BitBoard(size, size)
+        for mark in range(random.randrange(0, 5)):
+            board.mark_square(*random.choice(board.get_empty_squares()), mark % 2 + 1)
+            if board.winning_state():
+                break
+        if board.winning_state():
+            continue
+        maximizing = board.marked_squares % 2 == 0
+
+        results = []
+        for engine in ('serial', 'split'):
+            searcher = searchers.get((size, engine))
+            if searcher is None:
+                searcher = searchers[(size, engine)] = AlphaBeta(size, size, max_depth=depth_limit)
+                if engine == 'split':
+                    searcher.splitter = RootSplitter(workers)
+            searcher.orderer.age()
+            results.append(searcher.iterative_deepening(board, maximizing, time_limit))
+
+        if results[0] != results[1]:
+            differ += 1
+            print(f'{size}x{size} bits {board.bits}: serial {results[0]}, split {results[1]}')
+
+    print(f'{differ} of {positions} positions differ')
+
+
+if __name__ == '__main__':
+    check(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,77 @@
+# Batched random playouts in numpy
+# Thousands of random games from one position are played side by side on an (N, rows * columns) int8 array,
+# one ply for every game at once, with the win check vectorized over the line table
+
+import numpy as np
+
+from bitboard import LINE_MASKS, SizeTable, iter_bits, popcount
+
+DRAW = 3
+
+
+def line_squares(rows, columns, k):
+    # (lines, k) array of the square indices in each winning line
+    return np.array([list(iter_bits(mask)) for mask in LINE_MASKS[(rows, columns, k)]], dtype=np.intp)
+
+
+LINE_SQUARES = SizeTable(line_squares)
+
+
+def random_playouts(bits, to_move, rows, columns, count, rng=None, k=None):
+    """
+    plays count random games to the end from the position and returns an int8 array
+    with the outcome of each game, 1 or 2 for the winner or DRAW
+
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    lines = LINE_SQUARES[(rows, columns, k or min(rows, columns))]
+    squares = rows * columns
+
+    boards = np.zeros((count, squares), dtype=np.int8)
+    for player, mask in enumerate(bits, start=1):
+        boards[:, list(iter_bits(mask))] = player
+
+    # every game plays the empty squares in its own random order
+    empty = np.array(list(iter_bits(((1 << squares) - 1) & ~(bits[0] | bits[1]))), dtype=np.intp)
+    order = empty[np.argsort(rng.random((count, len(empty))), axis=1)]
+
+    outcome = np.zeros(count, dtype=np.int8)
+    games = np.arange(count)
+    player = to_move
+    for ply in range(len(empty)):
+        boards[games, order[games, ply]] = player
+        won = (boards[games][:, lines] == player).all(axis=2).any(axis=1)
+        outcome[games[won]] = player
+        games = games[~won]
+        if not len(games):
+            break
+        player = 3 - player
+
+    outcome[outcome == 0] = DRAW
+    return outcome
+
+
+class MonteCarloEvaluator:
+    def __init__(self, rows, columns, playouts=256, player=2):
+        self.rows = rows
+        self.columns = columns
+        self.playouts = playouts
+        self.player = player
+        # every score is a whole multiple of 1 / scale, like Evaluator.scale, which the shared table
+        # and the null window rely on. The scores are random though, so a split or shared search
+        # no longer returns the same eval and move as the serial one
+        self.scale = playouts + 1
+        self.rng = np.random.default_rng()
+
+    def evaluate(self, board):
+        """
+        returns the average result of random games from the position for player 1
+        (win 1, draw 0, loss -1), kept strictly between -1 and 1 like Evaluator.
+        Player 1 always moves first, so the side to move follows from the mark counts
+
+        """
+        bits = board.bits
+        to_move = 1 if popcount(bits[0]) == popcount(bits[1]) else self.player
+        outcome = random_playouts(bits, to_move, self.rows, self.columns, self.playouts, self.rng, board.k)
+        score = (np.count_nonzero(outcome == 1) - np.count_nonzero(outcome == self.player)) / self.scale
+        return float(score)
@@ -0,0 +1,192 @@
+# Proof number search for 4x4, the exact value of a position without a depth cap
+# Proves or disproves that one player wins, always growing the tree at the leaf that is cheapest to settle.
+# Winning for player 1, then for player 2, being disproved makes the position a draw.
+#
+#   python pns.py [position] [max nodes]
+#
+# position is the 16 squares row by row, 0 empty, 1 or 2 marked by that player, e.g. 1000020000000000.
+# The tree lives in memory and is capped at max nodes, the subtrees of settled nodes are dropped
+# when the cap is reached and the search gives up if that is not enough
+
+import math
+import sys
+import time as t
+
+from board import BitBoard
+from constants import *
+from symmetry import unique_moves
+
+
+class Node:
+    __slots__ = ('move', 'proof', 'disproof', 'children')
+
+    def __init__(self, move, proof=1, disproof=1):
+        self.move = move
+        # moves still needed to prove and to disprove the win, 0 once settled
+        self.proof = proof
+        self.disproof = disproof
+        # None until expanded
+        self.children = None
+
+
+class ProofNumberSearch:
+    def __init__(self, max_nodes=500000, min_marks=7):
+        # nodes kept in memory at once
+        self.max_nodes = max_nodes
+        # marks a position needs before a solve is worth a second or so, with fewer
+        # most 4x4 positions are still open after a few seconds
+        self.min_marks = min_marks
+        self.nodes = 0
+        # nodes expanded by the last search
+        self.expanded = 0
+        self.deadline = None
+        # stops the search when set, anything with an is_set method
+        self.token = None
+
+    def solve(self, board, time_limit=None):
+        """
+        returns the value of the position for player 1 (1, -1 or 0) and a move that keeps it,
+        None for a lost position, the player to move being the one with fewer marks (player 1 on a tie).
+        Returns None, None when the node cap or the time limit is reached first, or the token is set
+
+        """
+        self.deadline = t.time() + time_limit if time_limit is not None else None
+        self.expanded = 0
+        player = 1 if board.marked_squares % 2 == 0 else 2
+        sign = 1 if player == 1 else -1
+
+        won, root = self.prove(board, player)
+        if won is None:
+            return None, None
+        if won:
+            return sign, next((child.move for child in root.children or () if child.proof == 0), None)
+
+        lost, root = self.prove(board, 3 - player)
+        if lost is None:
+            return None, None
+        if lost:
+            # every move loses and the proof does not rank them, all their proof numbers are 0 by now
+            return -sign, None
+        return 0, next((child.move for child in root.children or () if child.disproof == 0), None)
+
+    def prove(self, board, player):
+        """
+        proves or disproves a win for player from the position and returns
+        True, False or None (out of nodes or time) with the root of the tree
+
+        """
+        root = Node(None)
+        winner = board.winning_state()
+        if winner or board.full_board():
+            root.proof, root.disproof = (0, math.inf) if winner == player else (math.inf, 0)
+            return root.proof == 0, root
+
+        self.nodes = 1
+        to_move = 1 if board.marked_squares % 2 == 0 else 2
+        while root.proof and root.disproof:
+            if self.deadline is not None and t.time() > self.deadline:
+                return None, root
+            if self.token is not None and self.token.is_set():
+                return None, root
+
+            # the most proving node, the child that settles its parent soonest
+            path = [root]
+            moving = to_move
+            node = root
+            while node.children is not None:
+                if moving == player:
+                    node = min(node.children, key=lambda child: child.proof)
+                else:
+                    node = min(node.children, key=lambda child: child.disproof)
+                board.mark_square(*node.move, moving)
+                path.append(node)
+                moving = 3 - moving
+
+            self.expand(node, board, moving, player)
+
+            for depth in range(len(path) - 1, -1, -1):
+                if depth:
+                    board.unmark_square(*path[depth].move)
+                self.update(path[depth], (to_move if depth % 2 == 0 else 3 - to_move) == player)
+
+            if self.nodes > self.max_nodes:
+                self.collect(root)
+                if self.nodes > self.max_nodes:
+                    return None, root
+
+        return root.proof == 0, root
+
+    def expand(self, node, board, moving, player):
+        moves = board.candidate_moves()
+        symmetries = board.symmetries()
+        if len(symmetries) > 1:
+            moves = unique_moves(moves, symmetries, board.rows, board.columns)
+
+        node.children = []
+        for row, col in moves:
+            board.mark_square(row, col, moving)
+            winner = board.last_move_win()
+            if winner == player:
+                child = Node((row, col), 0, math.inf)
+            elif winner or board.full_board() or board.blocked():
+                # a loss or a draw, either way the win is disproved
+                child = Node((row, col), math.inf, 0)
+            else:
+                child = Node((row, col))
+            board.unmark_square(row, col)
+            node.children.append(child)
+
+        self.nodes += len(node.children)
+        self.expanded += 1
+
+    def update(self, node, proving):
+        # the player proving the win picks one child, the other player has to be beaten in all of them
+        if node.children is None:
+            return
+        if proving:
+            node.proof = min(child.proof for child in node.children)
+            node.disproof = sum(child.disproof for child in node.children)
+        else:
+            node.proof = sum(child.proof for child in node.children)
+            node.disproof = min(child.disproof for child in node.children)
+
+    def collect(self, root):
+        """
+        drops the children of every settled node below the root, they are never visited again
+        as the search only walks unsettled nodes, and recounts the nodes kept
+
+        """
+        self.nodes = 1
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.children is None:
+                continue
+            if node is not root and (node.proof == 0 or node.disproof == 0):
+                node.children = None
+                continue
+            self.nodes += len(node.children)
+            stack.extend(node.children)
+
+
+def parse_position(text, rows=MEDIUM_ROWS, columns=MEDIUM_COLUMNS):
+    board = BitBoard(rows, columns)
+    for index, square in enumerate(text):
+        if square in '12':
+            board.mark_square(*divmod(index, columns), int(square))
+
+    return board
+
+
+if __name__ == '__main__':
+    position = sys.argv[1] if len(sys.argv) > 1 else '0' * (MEDIUM_ROWS * MEDIUM_COLUMNS)
+    searcher = ProofNumberSearch(max_nodes=int(sys.argv[2]) if len(sys.argv) > 2 else 500000)
+    start = t.time()
+    value, move = searcher.solve(parse_position(position))
+    if value is None:
+        print(f'Unresolved within {searcher.max_nodes} nodes')
+    else:
+        print(f'Value = {value} ({"player 1 wins" if value == 1 else "player 2 wins" if value == -1 else "draw"})')
+        print(f'Move = {move if move is not None else "any, every move loses"}')
+    print(f'Expanded = {searcher.expanded}')
+    print(f'Time = {round(t.time() - start, 2)}')
@@ -0,0 +1,242 @@
+# Alpha-beta search shared by the 3x3, 4x4 and 5x5 games, as principal variation search in negamax form
+# Player 1 is always the maximizing player, the AI (player 2 by default) the minimizing one
+
+import math
+import time as t
+
+from evaluation import Evaluator
+from ordering import MoveOrderer
+from symmetry import restore_move, transform_move, unique_moves
+from transposition import EXACT, LOWER, UPPER, SIDE_KEY, TranspositionTable
+
+# width of the null window, below the smallest gap between two evals (1 / scale of the evaluator, see Evaluator.scale)
+NULL_WINDOW = 1e-9
+
+
+class AlphaBeta:
+    def __init__(self, rows, columns, player=2, max_depth=None, k=None):
+        self.rows = rows
+        self.columns = columns
+        # marks in a row needed to win, the board size unless given
+        self.k = k or min(rows, columns)
+        self.player = player
+        # plies searched below the root, no cap unless given
+        self.max_depth = max_depth if max_depth is not None else rows * columns
+        # deepest search iterative_deepening starts, it moves max_depth itself
+        self.depth_limit = self.max_depth
+        self.table = TranspositionTable()
+        # any object with order, order_root and cutoff methods can be plugged in here
+        self.orderer = MoveOrderer(rows, columns, self.k)
+        self.evaluator = Evaluator(rows, columns, self.k)
+        # splits the root moves over worker processes when set, see parallel.py
+        self.splitter = None
+        # exact values of late positions when set, see tablebase.py
+        self.tablebase = None
+        # the only moves searched at the root when set, see threats.py
+        self.root_moves = None
+        self.deadline = None
+        # stops the search when set, anything with an is_set method
+        self.token = None
+        # best move of the depth before, tried first at the root, set by iterative_deepening
+        self.pv_move = None
+        # iterative_deepening runs each depth as MTD(f) when set, see mtdf
+        self.mtd = False
+        self.stopped = False
+        self.nodes = 0
+
+    def usable(self, entry, draft):
+        """
+        an entry is only trusted at the depth it was searched to, so a position scores the same
+        whatever the table holds (the parallel search relies on this).
+        A proven win or loss stays proven at any greater depth
+
+        """
+        return entry.depth == draft or (abs(entry.score) == 1 and entry.depth <= draft)
+
+    def minimax(self, board, alpha, beta, maximizing, depth):
+        """
+        returns the eval for player 1 and the best move, player 1 maximizing and the AI minimizing.
+        The search itself runs in negamax form, see negamax
+
+        """
+        if maximizing:
+            return self.negamax(board, alpha, beta, 1, depth)
+        score, move = self.negamax(board, -beta, -alpha, -1, depth)
+        return -score, move
+
+    def negamax(self, board, alpha, beta, colour, depth):
+        """
+        principal variation search, returns the eval for the player to move (colour 1 for player 1,
+        -1 for the AI) and the best move. The first move, the best one if the ordering is right,
+        is searched with the full window and every other one with a null window that only shows
+        it is no better, a move that does turn out better is searched again with the full window
+
+        """
+        # once the time is up every call returns straight away and the result is thrown out
+        self.nodes += 1
+        if self.nodes % 1024 == 0:
+            if self.deadline is not None and t.time() > self.deadline:
+                self.stopped = True
+            if self.token is not None and self.token.is_set():
+                self.stopped = True
+        if self.stopped:
+            return 0, None
+
+        # only the last move can have made a line, see BitBoard.last_move_win
+        case = board.last_move_win()
+
+        if case == 1:
+            return colour, None  # eval move
+        if case == 2:
+            return -colour, None
+        if board.full_board() or (depth and board.blocked()):
+            # below the root a dead draw ends the search too, every line holds marks of both players
+            return 0, None
+        if depth and self.tablebase is not None:
+            # the root still searches its moves so there is one to return
+            value = self.tablebase.probe(board.bits)
+            if value is not None:
+                return value * colour, None
+        if depth == self.max_depth:
+            # unresolved, scored by the open lines each player has, see evaluation.py
+            return self.evaluator.evaluate(board) * colour, None
+
+        # Transposition table lookup, entries searched to the same depth can cut off or narrow the window
+        # keyed by the canonical form so rotated and reflected positions share an entry,
+        # stored moves are in canonical coordinates and scores are for the player to move
+        key, transform = board.canonical_key()
+        if colour == 1:
+            key ^= SIDE_KEY
+        draft = min(self.max_depth - depth, self.rows * self.columns - board.marked_squares)
+        hash_move = None
+        # the root does not read the table, what it holds there depends on the searches before
+        # (and which process ran them in the split search), see MoveOrderer.order_root
+        entry = self.table.probe(key) if depth else None
+        if entry is not None:
+            hash_move = restore_move(entry.move, transform, board.rows, board.columns)
+            if self.usable(entry, draft):
+                if entry.flag == EXACT:
+                    return entry.score, hash_move
+                if entry.flag == LOWER:
+                    alpha = max(alpha, entry.score)
+                elif entry.flag == UPPER:
+                    beta = min(beta, entry.score)
+                if beta <= alpha:
+                    return entry.score, hash_move
+
+        alpha_orig, beta_orig = alpha, beta
+        empty_sqrs = board.candidate_moves()
+        if depth == 0 and self.root_moves is not None:
+            empty_sqrs = [move for move in empty_sqrs if move in self.root_moves]
+        # only one of the squares that a symmetry of the position maps onto each other is searched
+        symmetries = board.symmetries()
+        if len(symmetries) > 1:
+            empty_sqrs = unique_moves(empty_sqrs, symmetries, board.rows, board.columns)
+        # the best move from an earlier search of this position is tried first, see ordering.py
+        if depth == 0:
+            empty_sqrs = self.orderer.order_root(empty_sqrs, self.pv_move)
+        else:
+            empty_sqrs = self.orderer.order(empty_sqrs, board.marked_squares, hash_move)
+
+        if depth == 0 and self.splitter is not None:
+            # the splitter works with evals for player 1
+            if colour == 1:
+                best_eval, best_move = self.splitter.search_root(self, board, empty_sqrs, alpha, beta, True)
+            else:
+                best_eval, best_move = self.splitter.search_root(self, board, empty_sqrs, -beta, -alpha, False)
+                best_eval = -best_eval
+
+        else:
+            best_eval = -math.inf
+            best_move = None
+            player = 1 if colour == 1 else self.player
+
+            for row, col in empty_sqrs:
+                board.mark_square(row, col, player)
+                if best_move is None:
+                    ai_eval = -self.negamax(board, -beta, -alpha, -colour, depth + 1)[0]
+                else:
+                    ai_eval = -self.negamax(board, -alpha - NULL_WINDOW, -alpha, -colour, depth + 1)[0]
+                    if alpha < ai_eval < beta and not self.stopped:
+                        # better than the best so far, ai_eval is only a lower bound
+                        ai_eval = -self.negamax(board, -beta, -ai_eval, -colour, depth + 1)[0]
+                board.unmark_square(row, col)
+                if self.stopped:
+                    return 0, None
+                if ai_eval > best_eval:
+                    best_eval = ai_eval
+                    best_move = (row, col)
+                #  Alpha beta pruning being performed here
+                alpha = max(alpha, ai_eval)
+                if beta <= alpha:
+                    self.orderer.cutoff((row, col), board.marked_squares, draft)
+                    break
+
+        if self.stopped:
+            return 0, None
+
+        self.table.store(key, draft, best_eval, alpha_orig, beta_orig,
+                         transform_move(best_move, transform, board.rows, board.columns))
+        return best_eval, best_move
+
+    def mtdf(self, board, maximizing, guess=0):
+        """
+        returns the same eval as minimax with the full window, found through null window searches only.
+        Each search shows the eval is above or below a test value, which narrows the bounds around it
+        until they meet, the transposition table keeping what the earlier searches found.
+        The move is the one from the last search that failed high, it reaches at least the final eval
+
+        """
+        colour = 1 if maximizing else -1
+        score = guess * colour
+        lower, upper = -math.inf, math.inf
+        best_move = None
+        while lower < upper:
+            beta = max(score, lower + NULL_WINDOW)
+            score, move = self.negamax(board, beta - NULL_WINDOW, beta, colour, 0)
+            if self.stopped:
+                return 0, None
+            if score < beta:
+                upper = score
+            else:
+                lower = score
+                best_move = move
+
+        return score * colour, best_move
+
+    def iterative_deepening(self, board, maximizing, time_limit):
+        """
+        searches to depth 1, 2, 3... up to depth_limit until time_limit seconds have passed and
+        returns the eval and move of the last depth that finished.
+        Each search leaves its best moves in the transposition table, which the next depth tries first
+
+        """
+        start = t.time()
+        self.stopped = False
+        self.pv_move = None
+        best = None
+
+        for max_depth in range(1, min(self.depth_limit, self.rows * self.columns - board.marked_squares) + 1):
+            self.max_depth = max_depth
+            # the first depth always finishes so there is a move to return, unless the token stops it
+            self.deadline = start + time_limit if best is not None else None
+            if self.mtd:
+                # the eval of the depth before is the first guess
+                result = self.mtdf(board, maximizing, best[0] if best is not None else 0)
+            else:
+                result = self.minimax(board, -math.inf, math.inf, maximizing, 0)
+            if self.stopped:
+                # report the depth that finished
+                self.max_depth = max_depth - 1
+                break
+            best = result
+            self.pv_move = best[1]
+
+            # a win or loss found at this depth is already exact
+            if abs(best[0]) == 1:
+                break
+
+        self.deadline = None
+        self.stopped = False
+        # None only when the token stopped the first depth
+        return best if best is not None else (0, None)
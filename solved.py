@@ -0,0 +1,86 @@
+# Perfect play for 3x3
+# Every reachable position is solved once, the first time it is needed, and kept in two small arrays
+# indexed by the position's base 3 code: sum of square * 3 ** (row * COLUMNS + col), square being 0, 1 or 2
+
+import numpy as np
+
+from bitboard import LINE_MASKS, iter_bits
+from constants import *
+
+SQUARES = ROWS * COLUMNS
+POWERS = [3 ** index for index in range(SQUARES)]
+LINES = [list(iter_bits(mask)) for mask in LINE_MASKS[(ROWS, COLUMNS, ROWS)]]
+
+UNSOLVED = -2
+NO_MOVE = -1
+
+# eval for player 1 (1 win, 0 draw, -1 loss) and best move square index of every code, built by solve
+_values = None
+_moves = None
+
+
+def position_code(squares):
+    code = 0
+    for row in range(ROWS):
+        for col in range(COLUMNS):
+            code += int(squares[row][col]) * POWERS[row * COLUMNS + col]
+
+    return code
+
+
+def winner(cells):
+    for a, b, c in LINES:
+        if cells[a] == cells[b] == cells[c] != 0:
+            return cells[a]
+    return 0
+
+
+def solve_position(cells, code, player, values, moves):
+    """
+    fills in values and moves for the position and everything reachable from it, player being the one to move.
+    Ties go to the first best square in row order
+
+    """
+    if values[code] != UNSOLVED:
+        return values[code]
+
+    case = winner(cells)
+    best_eval = 1 if case == 1 else -1 if case == 2 else 0
+    best_move = NO_MOVE
+
+    if not case and 0 in cells:
+        best_eval = None
+        for index in range(SQUARES):
+            if cells[index] == 0:
+                cells[index] = player
+                ai_eval = solve_position(cells, code + player * POWERS[index], 3 - player, values, moves)
+                cells[index] = 0
+                if best_eval is None or (player == 1 and ai_eval > best_eval) or (player == 2 and ai_eval < best_eval):
+                    best_eval = ai_eval
+                    best_move = index
+
+    values[code] = best_eval
+    moves[code] = best_move
+    return best_eval
+
+
+def solve():
+    global _values, _moves
+    values = np.full(3 ** SQUARES, UNSOLVED, dtype=np.int8)
+    moves = np.full(3 ** SQUARES, NO_MOVE, dtype=np.int8)
+    solve_position([0] * SQUARES, 0, 1, values, moves)
+    _values, _moves = values, moves
+
+
+def lookup(squares):
+    """
+    returns the eval and best (row, col) for the player to move, player 1 moving first.
+    The table is built on the first call
+
+    """
+    if _values is None:
+        solve()
+
+    code = position_code(squares)
+    move = int(_moves[code])
+    return int(_values[code]), (divmod(move, COLUMNS) if move != NO_MOVE else None)
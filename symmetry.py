@@ -0,0 +1,121 @@
+# The symmetries (rotations and reflections) of a board, 8 for a square board and 4 for a rectangle,
+# which only keeps the identity, the two reflections and the half turn
+# A transform is a permutation of square indices, perm[row * columns + col] is where that square ends up
+
+from bitboard import SizeTable, iter_bits
+
+
+def square_transforms(size):
+    """
+    returns the 8 symmetries of a size x size board as index permutations,
+    the identity is always transform 0
+
+    """
+    transforms = []
+    for rotation in range(4):
+        for reflect in (False, True):
+            perm = []
+            for index in range(size * size):
+                row, col = divmod(index, size)
+                if reflect:
+                    col = size - 1 - col
+                for _ in range(rotation):
+                    row, col = col, size - 1 - row
+                perm.append(row * size + col)
+            transforms.append(perm)
+
+    return transforms
+
+
+def rectangle_transforms(rows, columns):
+    """
+    returns the 4 symmetries of a rows x columns board with rows != columns as index permutations,
+    the identity is always transform 0
+
+    """
+    transforms = []
+    for flip_rows, flip_columns in ((False, False), (False, True), (True, False), (True, True)):
+        perm = []
+        for index in range(rows * columns):
+            row, col = divmod(index, columns)
+            if flip_rows:
+                row = rows - 1 - row
+            if flip_columns:
+                col = columns - 1 - col
+            perm.append(row * columns + col)
+        transforms.append(perm)
+
+    return transforms
+
+
+def board_transforms(rows, columns):
+    return square_transforms(rows) if rows == columns else rectangle_transforms(rows, columns)
+
+
+def inverse_transforms(transforms):
+    inverses = []
+    for perm in transforms:
+        inverse = [0] * len(perm)
+        for index, image in enumerate(perm):
+            inverse[image] = index
+        inverses.append(inverse)
+
+    return inverses
+
+
+# Transforms per board size, keyed (rows, columns)
+TRANSFORMS = SizeTable(board_transforms)
+INVERSES = SizeTable(lambda rows, columns: inverse_transforms(TRANSFORMS[(rows, columns)]))
+
+
+def transform_bits(mask, perm):
+    transformed = 0
+    for index in iter_bits(mask):
+        transformed |= 1 << perm[index]
+
+    return transformed
+
+
+def canonical(bits, rows, columns):
+    """
+    returns the canonical form of a position, the smallest (player 1, player 2) bitmask pair
+    over the symmetries of the board, and the transform that maps the board onto it
+
+    """
+    best = None
+    best_transform = 0
+    for transform, perm in enumerate(TRANSFORMS[(rows, columns)]):
+        form = (transform_bits(bits[0], perm), transform_bits(bits[1], perm))
+        if best is None or form < best:
+            best = form
+            best_transform = transform
+
+    return best, best_transform
+
+
+def transform_move(move, transform, rows, columns):
+    # maps a real (row, col) into the transformed board
+    image = TRANSFORMS[(rows, columns)][transform][move[0] * columns + move[1]]
+    return divmod(image, columns)
+
+
+def restore_move(move, transform, rows, columns):
+    # maps a (row, col) of the transformed board back to real coordinates
+    index = INVERSES[(rows, columns)][transform][move[0] * columns + move[1]]
+    return divmod(index, columns)
+
+
+def unique_moves(moves, symmetries, rows, columns):
+    """
+    returns one move per group of moves that the given symmetries of the position map onto each other,
+    the square with the smallest index is kept
+
+    """
+    transforms = TRANSFORMS[(rows, columns)]
+    unique = []
+    for row, col in moves:
+        index = row * columns + col
+        if all(transforms[transform][index] >= index for transform in symmetries):
+            unique.append((row, col))
+
+    return unique
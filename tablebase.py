@@ -0,0 +1,207 @@
+# Endgame tablebase for 4x4, the exact value of every reachable position with at least half the board marked
+# Built offline by retrograde analysis and written to a binary file that the search probes through numpy.memmap,
+# so only the pages a probe touches are ever read from disk.
+#
+#   python tablebase.py [path]
+#
+# Positions are stored once per symmetry class under their canonical key, the smallest
+# player 1 bits | player 2 bits << 16 over the 8 symmetries. The file holds the sorted uint32 keys
+# followed by one int8 value per key (1 player 1 wins, -1 player 2 wins, 0 draw)
+
+import os
+import sys
+import time as t
+
+import numpy as np
+
+from bitboard import LINE_MASKS, popcount
+from constants import *
+from symmetry import TRANSFORMS
+
+SQUARES = MEDIUM_ROWS * MEDIUM_COLUMNS
+MIN_MARKS = SQUARES // 2
+TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase4x4.bin')
+
+LINES = LINE_MASKS[(MEDIUM_ROWS, MEDIUM_COLUMNS, MEDIUM_ROWS)]
+
+
+def byte_tables():
+    """
+    returns, per transform, the image of every value of the low and of the high byte of a 16 square mask,
+    so a mask transforms in two lookups
+
+    """
+    tables = []
+    for perm in TRANSFORMS[(MEDIUM_ROWS, MEDIUM_COLUMNS)]:
+        low = [0] * 256
+        high = [0] * 256
+        for value in range(256):
+            for index in range(8):
+                if value >> index & 1:
+                    low[value] |= 1 << perm[index]
+                    high[value] |= 1 << perm[index + 8]
+        tables.append((low, high))
+
+    return tables
+
+
+BYTE_TABLES = byte_tables()
+
+
+def canonical_key(bits):
+    best = None
+    for low, high in BYTE_TABLES:
+        key = low[bits[0] & 0xFF] | high[bits[0] >> 8] | (low[bits[1] & 0xFF] | high[bits[1] >> 8]) << 16
+        if best is None or key < best:
+            best = key
+
+    return best
+
+
+def canonical_keys(keys):
+    # canonical_key over a uint32 array of keys
+    best = None
+    for low_table, high_table in BYTE_TABLES:
+        low = np.array(low_table, dtype=np.uint32)
+        high = np.array(high_table, dtype=np.uint32)
+        form = low[keys & 0xFF] | high[keys >> 8 & 0xFF] | (low[keys >> 16 & 0xFF] | high[keys >> 24]) << 16
+        best = form if best is None else np.minimum(best, form)
+
+    return best
+
+
+def winners(keys):
+    # 1 or 2 for the player with a line in each position, else 0
+    won = np.zeros(len(keys), dtype=np.int8)
+    for line in LINES:
+        won[(keys & line) == line] = 1
+        won[(keys >> 16 & line) == line] = 2
+
+    return won
+
+
+def children(keys, marks):
+    """
+    returns the canonical key of every position one move on, a (positions, squares) array,
+    0 where the square is taken (0 is never the key of a position with marks + 1 marks)
+
+    """
+    shift = 0 if marks % 2 == 0 else 16
+    occupied = (keys | keys >> 16) & 0xFFFF
+    moves = np.zeros((len(keys), SQUARES), dtype=np.uint32)
+    for index in range(SQUARES):
+        empty = (occupied >> index & 1) == 0
+        moves[empty, index] = canonical_keys(keys[empty] | np.uint32(1 << (index + shift)))
+
+    return moves
+
+
+def reachable_layers():
+    # the canonical keys of the positions reachable with 0, 1 ... 16 marks, sorted, stopping at wins
+    layers = [np.zeros(1, dtype=np.uint32)]
+    for marks in range(SQUARES):
+        keys = layers[-1]
+        keys = keys[winners(keys) == 0]
+        moves = children(keys, marks)
+        layers.append(np.unique(moves[moves != 0]))
+
+    return layers
+
+
+def retrograde(layers, min_marks=MIN_MARKS):
+    """
+    returns the values of the layers from min_marks marks on, working back from the full board.
+    A finished game scores its result, any other position the best of the positions one move on
+    for the player to move, player 1 taking the largest value and player 2 the smallest
+
+    """
+    values = [None] * len(layers)
+    for marks in range(SQUARES, min_marks - 1, -1):
+        keys = layers[marks]
+        won = winners(keys)
+        value = np.zeros(len(keys), dtype=np.int8)
+        value[won == 1] = 1
+        value[won == 2] = -1
+
+        playing = np.flatnonzero(won == 0)
+        if marks < SQUARES and len(playing):
+            moves = children(keys[playing], marks)
+            found = moves != 0
+            child = np.zeros(moves.shape, dtype=np.int8)
+            child[found] = values[marks + 1][np.searchsorted(layers[marks + 1], moves[found])]
+            if marks % 2 == 0:
+                child[~found] = -2
+                value[playing] = child.max(axis=1)
+            else:
+                child[~found] = 2
+                value[playing] = child.min(axis=1)
+
+        values[marks] = value
+        print(f'{marks} marks: {len(keys)} positions')
+
+    return values
+
+
+def build(path=TABLEBASE_PATH, min_marks=MIN_MARKS):
+    start = t.time()
+    layers = reachable_layers()
+    values = retrograde(layers, min_marks)
+
+    keys = np.concatenate(layers[min_marks:])
+    value = np.concatenate(values[min_marks:])
+    # every layer is sorted and the keys of a later layer have more bits set, not necessarily larger values
+    order = np.argsort(keys, kind='stable')
+    with open(path, 'wb') as file:
+        file.write(keys[order].astype('<u4').tobytes())
+        file.write(value[order].astype(np.int8).tobytes())
+
+    print(f'{len(keys)} positions written to {path} in {round(t.time() - start, 2)} seconds')
+
+
+class Tablebase:
+    def __init__(self, path=TABLEBASE_PATH, min_marks=MIN_MARKS):
+        """
+        opens a file written by build, nothing is read until the first probe.
+        Each entry is a 4 byte key and a 1 byte value
+
+        """
+        self.path = path
+        self.min_marks = min_marks
+        count = os.path.getsize(path) // 5
+        self.keys = np.memmap(path, dtype='<u4', mode='r', shape=(count,))
+        self.values = np.memmap(path, dtype=np.int8, mode='r', offset=4 * count, shape=(count,))
+
+    def probe(self, bits):
+        """
+        returns the exact value of the position for player 1 (1, -1 or 0),
+        or None while fewer than min_marks squares are marked
+
+        """
+        if popcount(bits[0] | bits[1]) < self.min_marks:
+            return None
+
+        key = canonical_key(bits)
+        index = int(np.searchsorted(self.keys, np.uint32(key)))
+        if index == len(self.keys) or self.keys[index] != key:
+            return None
+        return int(self.values[index])
+
+
+# tablebases already opened in this process, by path
+_tablebases = {}
+
+
+def open_tablebase(path=TABLEBASE_PATH):
+    """
+    returns the Tablebase for the file, opening it once per process,
+    or None when the file has not been built
+
+    """
+    if path not in _tablebases:
+        _tablebases[path] = Tablebase(path) if os.path.exists(path) else None
+
+    return _tablebases[path]
+
+
+if __name__ == '__main__':
+    build(*sys.argv[1:2])
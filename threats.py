@@ -0,0 +1,107 @@
+# Threat space search, forced wins found by looking only at forcing moves
+# A threat is a move after which the player needs one more mark to complete a line, so the other player
+# has to block that square. Only threats are tried for the attacker and only the block for the defender,
+# which keeps the tree narrow enough to see wins many moves deeper than the full width search.
+#
+# The search is sound: a win it returns holds against every defence. The defender's own threats are
+# respected, when the defender could complete a line the attacker has to block it with a threat of its own.
+# Wins that need a quieter move somewhere in the sequence are not found
+
+from bitboard import iter_bits
+
+
+def forced_move(board, player):
+    """
+    returns the square that completes a line for the player, who is to move, and True,
+    or the one square where the other player would complete a line and False.
+    None, False when there is neither, or more than one square to block and the search has to find the best loss
+
+    """
+    wins = board.winning_squares(player)
+    if wins:
+        return wins[0], True
+
+    blocks = board.winning_squares(3 - player)
+    if len(blocks) == 1:
+        return blocks[0], False
+    return None, False
+
+
+class ThreatSearch:
+    def __init__(self, max_threats=10):
+        # threats the attacker may make in one sequence
+        self.max_threats = max_threats
+        # canonical keys of positions already shown to hold no win for the attacker at a depth
+        self.refuted = {}
+        self.nodes = 0
+
+    def forced_win(self, board, player):
+        """
+        returns the (row, col) that starts a forced win for the player, who is to move,
+        or None when no sequence of threats wins
+
+        """
+        self.refuted.clear()
+        return self.attack(board, player, self.max_threats)
+
+    def attack(self, board, player, threats):
+        self.nodes += 1
+        wins = board.winning_squares(player)
+        if wins:
+            return wins[0]
+
+        # the defender completes a line next move unless the attacker blocks it, two such squares lose
+        blocks = board.winning_squares(3 - player)
+        if len(blocks) > 1 or threats == 0:
+            return None
+
+        key = (board.canonical_key()[0], player)
+        if self.refuted.get(key, -1) >= threats:
+            return None
+
+        for row, col in self.threat_moves(board, player):
+            if blocks and (row, col) != blocks[0]:
+                continue
+
+            board.mark_square(row, col, player)
+            replies = board.winning_squares(player)
+            won = len(replies) > 1
+            if len(replies) == 1:
+                # the defender's only move
+                board.mark_square(*replies[0], 3 - player)
+                won = self.attack(board, player, threats - 1) is not None
+                board.unmark_square(*replies[0])
+            board.unmark_square(row, col)
+
+            if won:
+                return row, col
+
+        self.refuted[key] = threats
+        return None
+
+    def threat_moves(self, board, player):
+        # the empty squares that leave the player one mark short of a line, in row order
+        occupied = board.bits[0] | board.bits[1]
+        squares = set()
+        for line in board.open_lines(player, board.k - 2):
+            squares.update(iter_bits(board.lines[line] & ~occupied))
+
+        return [divmod(square, board.columns) for square in sorted(squares)]
+
+    def defences(self, board, player):
+        """
+        returns the moves for the player, who is to move, after which the other player has no forced win,
+        or None when the other player has none to begin with or nothing stops it
+
+        """
+        if self.forced_win(board, 3 - player) is None:
+            return None
+
+        moves = []
+        for row, col in board.candidate_moves():
+            board.mark_square(row, col, player)
+            if self.forced_win(board, 3 - player) is None:
+                moves.append((row, col))
+            board.unmark_square(row, col)
+
+        return moves or None
@@ -0,0 +1,65 @@
+# Zobrist hashing and the transposition table used by the alpha-beta search
+
+import random
+from collections import namedtuple
+
+from bitboard import SizeTable
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+Entry = namedtuple('Entry', ['depth', 'score', 'flag', 'move'])
+
+
+def zobrist_keys(rows, columns, seed=0):
+    """
+    returns one random 64 bit key per player per square,
+    keys[player - 1][row * columns + col]
+
+    """
+    rng = random.Random(seed)
+    return [[rng.getrandbits(64) for _ in range(rows * columns)] for _ in range(2)]
+
+
+# Keys per board size, keyed (rows, columns), seeded so hashes are the same on every run
+ZOBRIST_KEYS = SizeTable(zobrist_keys)
+
+# Xor-ed into the hash when the maximizing player is to move
+SIDE_KEY = random.Random(1).getrandbits(64)
+
+
+def bound_flag(score, alpha, beta):
+    # alpha and beta are the window the position was searched with
+    if score <= alpha:
+        return UPPER
+    if score >= beta:
+        return LOWER
+    return EXACT
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=1000000):
+        self.entries = {}
+        self.max_entries = max_entries
+
+    def probe(self, key):
+        return self.entries.get(key)
+
+    def store(self, key, depth, score, alpha, beta, move):
+        """
+        stores a search result, alpha and beta are the window the position was searched with
+        so the score is kept as an upper bound (fail low), lower bound (fail high) or exact value
+
+        """
+        flag = bound_flag(score, alpha, beta)
+
+        # the newest search of a position always replaces the old one
+        if key not in self.entries and len(self.entries) >= self.max_entries:
+            self.entries.clear()
+
+        self.entries[key] = Entry(depth, score, flag, move)
+
+    def clear(self):
+        self.entries.clear()